@@ -1,27 +1,70 @@
-"""Code for the inverse quantum fourier transform."""
+"""Code for the quantum fourier transform and its inverse."""
+
+from functools import lru_cache
 
 import numpy as np
 
 from qiskit import QuantumCircuit
 
 
+@lru_cache(maxsize=None)
 def iqft(num_qubits):
     """
     Returns a gate that applies the inverse quantum fourier transform.
 
+    The gate only depends on the number of qubits, so it is built once per size and
+    shared between circuits.
+
     Based on the implementation found in Qiskit's QPE tutorial:
     https://qiskit.org/textbook/ch-algorithms/quantum-phase-estimation.html
     """
     qc = QuantumCircuit(num_qubits)
+    cp = qc.cp
 
-    for qubit in range(num_qubits // 2):
-        qc.swap(qubit, num_qubits - qubit - 1)
+    for qubit, mirrored_qubit in zip(
+        range(num_qubits // 2), reversed(range(num_qubits))
+    ):
+        qc.swap(qubit, mirrored_qubit)
+
+    # The rotation between qubits m < j is -pi / 2^(j - m), so the angles applied to qubit j
+    # are the last j entries of this array.
+    angles = -np.pi / 2.0 ** np.arange(num_qubits, 0, -1)
 
     for j in range(num_qubits):
-        for m in range(j):
-            qc.cp(-np.pi / float(2 ** (j - m)), m, j)
+        for m, angle in enumerate(angles[num_qubits - j :]):
+            cp(angle, m, j)
         qc.h(j)
 
     iqft_gate = qc.to_gate()
     iqft_gate.name = "IQFT"
     return iqft_gate
+
+
+@lru_cache(maxsize=None)
+def qft(num_qubits):
+    """
+    Returns a gate that applies the quantum fourier transform.
+
+    The gates of the inverse quantum fourier transform are applied in reverse order with
+    negated rotations, so that this gate undoes the one returned by iqft.
+    """
+    qc = QuantumCircuit(num_qubits)
+    cp = qc.cp
+
+    # The rotation between qubits m < j is pi / 2^(j - m), so the angles applied to qubit j
+    # are the last j entries of this array.
+    angles = np.pi / 2.0 ** np.arange(num_qubits, 0, -1)
+
+    for j in reversed(range(num_qubits)):
+        qc.h(j)
+        for m, angle in reversed(list(enumerate(angles[num_qubits - j :]))):
+            cp(angle, m, j)
+
+    for qubit, mirrored_qubit in zip(
+        range(num_qubits // 2), reversed(range(num_qubits))
+    ):
+        qc.swap(qubit, mirrored_qubit)
+
+    qft_gate = qc.to_gate()
+    qft_gate.name = "QFT"
+    return qft_gate
@@ -1,15 +1,38 @@
 """An implementation of a quantum algorithm for the subset sum problem."""
 
+import math
+import operator
+import os
+
 import numpy as np
 
 from qiskit import ClassicalRegister, QuantumRegister, QuantumCircuit
-from qiskit import Aer, assemble, transpile
+from qiskit import transpile
 from qiskit import IBMQ
-from qiskit.assembler import disassemble
-from qiskit.execute_function import execute
+from qiskit.circuit.equivalence_library import SessionEquivalenceLibrary
+from qiskit.extensions.quantum_initializer.diagonal import DiagonalGate
+from qiskit.providers.aer import AerSimulator
 from qiskit.providers.ibmq.job import job_monitor
+from qiskit.transpiler import PassManager
+from qiskit.transpiler.passes import BasisTranslator, UnrollCustomDefinitions
+
+from .iqft import iqft, qft
+
+# When simulating, phase encodings over up to this many sum and index qubits are applied as a
+# single diagonal gate. The diagonal has an entry per basis state, so larger encodings use
+# controlled phases. The pinned Aer release only simulates diagonal gates reliably in double
+# precision, which is why the simulator is not run in single precision.
+DIAGONAL_ENCODING_MAX_QUBITS = 16
+
+# Circuits up to this many qubits are simulated directly as a NumPy statevector.
+NUMPY_SIMULATION_MAX_QUBITS = 12
 
-from .iqft import iqft
+# The number of measurements drawn from the NumPy statevector, matching Aer's default.
+NUMPY_SIMULATION_SHOTS = 1024
+
+# IBMQ backends by name. Loading the account and fetching backends both require network
+# requests, so this is only done once per backend.
+_backend_cache = {}
 
 
 class QuantumSubsetSum:
@@ -34,14 +57,24 @@ class QuantumSubsetSum:
         self.num_values = len(values)
 
         # The number of sum qubits is equal to the number necessary to store the
-        # largest possible sum.
-        self.num_sum_qubits = int(np.round(np.log(sum(values)) / np.log(2))) + 1
-
-        # Given that we are using amplitude implication on subsets, we can guarantee that solution
-        # states will have significantly high measurement probabilities after a number of iterations
-        # equal to the square root of the number of subsets. In practice, it may be less, but this
-        # number mitigates the worse case scenario.
-        self.num_grover_iterations = int(np.sqrt(2 ** self.num_values))
+        # largest possible sum. Rounding log2 of the sum to the nearest integer is done with
+        # integer arithmetic: it rounds up exactly when the sum exceeds 2^(floor(log2) + 1/2).
+        largest_sum = operator.index(sum(values))
+        floor_log2 = largest_sum.bit_length() - 1
+        self.num_sum_qubits = floor_log2 + 1
+        if largest_sum * largest_sum > 1 << (2 * floor_log2 + 1):
+            self.num_sum_qubits += 1
+
+        # Amplitude amplification acts on all N + 1 index qubits, including the one for the
+        # target sum, so solution states reach their highest measurement probabilities after
+        # about pi/4 * sqrt(2^(N + 1) / M) iterations, where M is the number of solutions. M is
+        # not known ahead of time, so the count for two solutions, pi/4 * sqrt(2^N), is used.
+        # Inputs with more solutions are amplified close to their optimum, whereas a single
+        # solution is under-iterated and measured with a probability of roughly 0.8, rather than
+        # the 0.9 and above it would reach after about 40% more iterations.
+        self.num_grover_iterations = max(
+            1, round(math.pi / 4 * math.sqrt(1 << self.num_values))
+        )
 
         # An index qubit is created for each input value, including the target sum.
         num_indices = self.num_values + 1
@@ -49,7 +82,17 @@ class QuantumSubsetSum:
         self.sums = QuantumRegister(self.num_sum_qubits)
         self.indices = QuantumRegister(num_indices)
         self.grover_output = QuantumRegister(1)
-        self.indices_classical = ClassicalRegister(num_indices)
+        self.num_qubits = self.num_sum_qubits + num_indices + 1
+
+        # Only the index qubits of the input values are measured, as the target sum index
+        # qubit does not correspond to a subset element.
+        self.indices_classical = ClassicalRegister(self.num_values)
+
+        # Flat qubit lists reused whenever gates are appended or broadcast over registers.
+        self._sum_qubits = list(self.sums)
+        self._index_qubits = list(self.indices)
+        self._sum_index_qubits = self._sum_qubits + self._index_qubits
+        self._all_qubits = self._sum_index_qubits + list(self.grover_output)
 
         self.qc = QuantumCircuit(
             self.sums, self.indices, self.grover_output, self.indices_classical
@@ -57,53 +100,111 @@ class QuantumSubsetSum:
 
         self.counts = {}
 
-    def encode_phase(self, normalized_value, index, qc):
+    def encode_phase(self, angles, index, qc):
         """
         Encodes a value into the sum qubits and associates the value with an index qubit.
 
         Arguments:
-            normalized_value: A value normalized so that it is between 0 and 1.
+            angles: The phase angles encoding the value, one for each sum qubit.
             index: The index qubit to associate the value with during phase encoding.
         """
-        power = 1
-        theta = 2 * np.pi * normalized_value
-        for sum_qubit in range(self.sums.size):
-            qc.cp(theta * power, self.sums[sum_qubit], self.indices[index])
-            power *= 2
+        cp = qc.cp
+        index_qubit = self._index_qubits[index]
+        for sum_qubit, angle in zip(self._sum_qubits, angles):
+            cp(angle, sum_qubit, index_qubit)
 
-    def encode_values_in_phase(self, normalized_values, normalized_target):
+    def phase_angles(self, normalized_values, normalized_target):
         """
-        Encodes input values and the negated target sum into the phase of the sum qubits
-        via quantum phase estimation.
+        Computes the phase angles used to encode input values and the negated target sum.
 
         Arguments:
             normalized_values: A set of values normalized to be between 0 and 1.
             normalized_target: The normalized target sum.
 
         Returns:
-            qiskit.circuit.gate.Gate: The quantum phase estimation operation represented as a gate.
+            numpy.ndarray: The phase angles, with a row for each index qubit and a column for
+                each sum qubit.
         """
-        qc = QuantumCircuit(self.sums, self.indices)
+        # The target sum is encoded as negative phase. This leads to it canceling out any subset
+        # sums that are equal to the target sum, which we can take advantage of when carrying
+        # out amplitude amplification. The angle doubles with each sum qubit, which ldexp
+        # applies exactly by scaling the exponent.
+        thetas = 2 * np.pi * np.append(normalized_values, -normalized_target)
+        return np.ldexp(thetas[:, None], np.arange(self.num_sum_qubits))
 
-        # Putting sum and index qubits into superposition.
-        qc.h(self.sums)
-        qc.h(self.indices)
+    def encoding_diagonal(self, angles):
+        """
+        Computes the diagonal of the unitary applied by encoding all values into phase.
 
-        # Encoding set values.
-        for index, value in enumerate(normalized_values):
-            self.encode_phase(value, index, qc)
+        Arguments:
+            angles: The phase angles computed by phase_angles.
 
-        # Encoding target sum as negative phase. This leads to it canceling out any subset
-        # sums that are equal to the target sum, which we can take advantage of when carrying
-        # out amplitude amplification.
-        self.encode_phase(-normalized_target, len(normalized_values), qc)
+        Returns:
+            numpy.ndarray: The diagonal, indexed by the state of the sum and index qubits with
+                the sum qubits being least significant.
+        """
+        num_indices = self.num_values + 1
 
-        # Applying the inverse QFT to bring subet sums out of the frequency domain.
-        qc.append(iqft(self.num_sum_qubits), self.sums)
+        # Each index qubit that is set contributes the base angle of its value once for every
+        # unit of the state of the sum qubits.
+        index_states = np.arange(2 ** num_indices)
+        index_bits = (index_states[:, None] >> np.arange(num_indices)) & 1
+        index_phases = index_bits @ angles[:, 0]
+
+        sum_states = np.arange(2 ** self.num_sum_qubits)
+        return np.exp(1j * np.outer(index_phases, sum_states)).ravel()
+
+    def encode_values_in_phase(self, angles, qc, inverse=False, use_diagonal=False):
+        """
+        Encodes input values and the negated target sum into the phase of the sum qubits
+        via quantum phase estimation.
+
+        The operation is appended gate by gate to the provided circuit rather than being
+        wrapped into a gate of its own.
+
+        Arguments:
+            angles: The phase angles computed by phase_angles.
+            qc: The circuit to append the operation to.
+            inverse: Whether to append the inverse operation, undoing the encoding.
+            use_diagonal: Whether small encodings may be applied as a single diagonal gate.
+        """
+        # The controlled phases are jointly diagonal, so for small encodings they can be
+        # collapsed into a single diagonal gate. This is only worthwhile for simulators that
+        # apply the diagonal natively, as it is synthesized into exponentially many gates
+        # for hardware.
+        use_diagonal = (
+            use_diagonal
+            and len(self._sum_index_qubits) <= DIAGONAL_ENCODING_MAX_QUBITS
+        )
+
+        if inverse:
+            # Undoing the inverse QFT, then the phase encoding with negated angles and finally
+            # the superposition.
+            qc.append(qft(self.num_sum_qubits), self._sum_qubits)
+            if use_diagonal:
+                diagonal = self.encoding_diagonal(angles).conj()
+                qc.append(DiagonalGate(list(diagonal)), self._sum_index_qubits)
+            else:
+                for index, value_angles in reversed(list(enumerate(angles))):
+                    self.encode_phase(-value_angles, index, qc)
+            qc.h(self._index_qubits)
+            qc.h(self._sum_qubits)
+            return
+
+        # Putting sum and index qubits into superposition.
+        qc.h(self._sum_qubits)
+        qc.h(self._index_qubits)
 
-        qpe_gate = qc.to_gate()
-        qpe_gate.name = "QPE"
-        return qpe_gate
+        # Encoding set values and the target sum.
+        if use_diagonal:
+            diagonal = self.encoding_diagonal(angles)
+            qc.append(DiagonalGate(list(diagonal)), self._sum_index_qubits)
+        else:
+            for index, value_angles in enumerate(angles):
+                self.encode_phase(value_angles, index, qc)
+
+        # Applying the inverse QFT to bring subet sums out of the frequency domain.
+        qc.append(iqft(self.num_sum_qubits), self._sum_qubits)
 
     def oracle(self):
         """
@@ -112,34 +213,41 @@ class QuantumSubsetSum:
         Returns:
             qiskit.circuit.gate.Gate: The oracle operation represented as a gate.
         """
-        qc = QuantumCircuit(self.sums, self.indices, self.grover_output)
+        qc = QuantumCircuit(self.sums, self.indices)
 
         # If all the sum qubits are zero, we mark the state as a solution. We look for states
         # with zero sum due to the fact that we encoded the negative target sum. This makes
         # finding states significantly easier as the oracle does not change based on the target
-        # sum.
-        qc.x(self.sums)
-        qc.mct(self.sums, self.grover_output)
-        qc.x(self.sums)
+        # sum. Marking is done by flipping the phase directly with a multi-controlled phase,
+        # which has the same effect as kicking back through the Grover qubit in |-> but is
+        # synthesized with one less control qubit.
+        # A single sum qubit has no controls, in which case its phase is flipped directly.
+        qc.x(self._sum_qubits)
+        if self.num_sum_qubits == 1:
+            qc.p(np.pi, self._sum_qubits[0])
+        else:
+            qc.mcp(np.pi, self._sum_qubits[:-1], self._sum_qubits[-1])
+        qc.x(self._sum_qubits)
 
         # Filtering out the all zero sums with all zero indices.
-        qc.x(self.sums)
-        qc.x(self.indices)
-        qc.mct(self.sums[:] + self.indices[:], self.grover_output)
-        qc.x(self.indices)
-        qc.x(self.sums)
+        qc.x(self._sum_qubits)
+        qc.x(self._index_qubits)
+        qc.mcp(np.pi, self._sum_index_qubits[:-1], self._sum_index_qubits[-1])
+        qc.x(self._index_qubits)
+        qc.x(self._sum_qubits)
 
         oracle_gate = qc.to_gate()
         oracle_gate.name = "Oracle"
         return oracle_gate
 
-    def diffuser(self, qpe_gate):
+    def diffuser(self, angles, use_diagonal=False):
         """
         Amplifies the amplitudes of marked states while diminishing the amplitudes
         of unmarked states.
 
         Arguments:
-            qpe_gate: The quantum phase estimation operation used to encode values.
+            angles: The phase angles used to encode values.
+            use_diagonal: Whether small phase encodings may be applied as a diagonal gate.
 
         Returns:
             qiskit.circuit.gate.Gate: The diffuser operation represented as a gate.
@@ -147,27 +255,32 @@ class QuantumSubsetSum:
         qc = QuantumCircuit(self.sums, self.indices, self.grover_output)
 
         # Rolling back the quantum phase estimation operation used to encode values.
-        qpe_inverse_gate = qpe_gate.inverse()
-        qc.append(qpe_inverse_gate, self.sums[:] + self.indices[:])
+        self.encode_values_in_phase(
+            angles, qc, inverse=True, use_diagonal=use_diagonal
+        )
 
         # Amplifying marked states and equivalently diminishing unmarked states.
-        qc.x(self.sums)
-        qc.x(self.indices)
-        qc.mct(self.sums[:] + self.indices[:], self.grover_output)
-        qc.x(self.indices)
-        qc.x(self.sums)
+        qc.x(self._sum_qubits)
+        qc.x(self._index_qubits)
+        qc.mct(self._sum_index_qubits, self.grover_output)
+        qc.x(self._index_qubits)
+        qc.x(self._sum_qubits)
 
         # Reapplying the quantum phase estimation operation used to encode values.
-        qc.append(qpe_gate, self.sums[:] + self.indices[:])
+        self.encode_values_in_phase(angles, qc, use_diagonal=use_diagonal)
 
         diffuser_gate = qc.to_gate()
         diffuser_gate.name = "Diffuser"
         return diffuser_gate
 
-    def build(self):
+    def build(self, use_diagonal=False):
         """
         Builds a quantum circuit that can solve a given instance of the subset sum problem.
 
+        Arguments:
+            use_diagonal: Whether small phase encodings may be applied as a single diagonal
+                gate, which is only beneficial when the circuit is simulated.
+
         Returns:
             qiskit.QuantumCircuit: The quantum circuit for determining subset sum solutions.
         """
@@ -177,30 +290,30 @@ class QuantumSubsetSum:
         self.qc.h(self.grover_output)
 
         # Normalizing values and target sum.
-        normalized_values = normalize(self.values + [self.target_sum])
-        normalized_target_sum = normalized_values[-1:][0]
-        normalized_values = normalized_values[:-1]
+        normalized_values, normalized_target_sum = normalize(
+            self.values, self.target_sum
+        )
 
         # Encoding values in phase of sum qubits resulting in a state which is a superposition
         # of all possible subset sums and their corresponding indices.
-        qpe_gate = self.encode_values_in_phase(normalized_values, normalized_target_sum)
-        self.qc.append(qpe_gate, self.sums[:] + self.indices[:])
+        angles = self.phase_angles(normalized_values, normalized_target_sum)
+        self.encode_values_in_phase(angles, self.qc, use_diagonal=use_diagonal)
+
+        # The oracle and diffuser are identical across Grover iterations, so they are
+        # constructed once and the same gates are appended on every iteration.
+        oracle_gate = self.oracle()
+        diffuser_gate = self.diffuser(angles, use_diagonal=use_diagonal)
 
         for _ in range(self.num_grover_iterations):
             # Executing an oracle which marks solution states.
-            self.qc.append(
-                self.oracle(), self.sums[:] + self.indices[:] + self.grover_output[:]
-            )
+            self.qc.append(oracle_gate, self._sum_index_qubits)
 
             # Applying a diffuser operation specific to the quantum phase estimation
             # used to encode values.
-            self.qc.append(
-                self.diffuser(qpe_gate),
-                self.sums[:] + self.indices[:] + self.grover_output[:],
-            )
+            self.qc.append(diffuser_gate, self._all_qubits)
 
         # Measuring results.
-        self.qc.measure(self.indices, self.indices_classical)
+        self.qc.measure(self._index_qubits[: self.num_values], self.indices_classical)
 
         return self.qc
 
@@ -211,14 +324,71 @@ class QuantumSubsetSum:
         Returns:
             dict: A set of measurements and their frequencies.
         """
-        aer_sim = Aer.get_backend("aer_simulator")
-        transpiled = transpile(qc, aer_sim)
-        qobj = assemble(transpiled)
-        result = aer_sim.run(qobj).result()
+        aer_sim = _aer_simulator()
+        result = aer_sim.run(_translate_for_aer(qc, aer_sim)).result()
         counts = result.get_counts()
         self.counts = counts
         return counts
 
+    def numpy_probabilities(self):
+        """
+        Computes the measurement probabilities of the subset sum circuit directly with NumPy.
+
+        For small instances, building and transpiling the circuit costs far more than simulating
+        it, so the state produced by the circuit is instead computed without constructing it.
+
+        Returns:
+            numpy.ndarray: The probability of measuring each state of the index qubits of the
+                input values.
+        """
+        num_indices = self.num_values + 1
+
+        angles = self.phase_angles(*normalize(self.values, self.target_sum))
+
+        # The state is laid out with one row per index state and one column per sum state,
+        # matching the qubit ordering of the circuit. Quantum phase estimation amounts to the
+        # phase encoding of a uniform superposition followed by an inverse QFT over the sums.
+        qpe_state = self.encoding_diagonal(angles).reshape(2 ** num_indices, -1)
+        qpe_state = np.fft.fft(qpe_state, axis=1, norm="ortho")
+        qpe_state /= np.sqrt(qpe_state.size)
+
+        state = qpe_state.copy()
+        for _ in range(self.num_grover_iterations):
+            # Marking zero sum states, excluding the one with all zero indices.
+            state[1:, 0] *= -1
+
+            # Undoing the phase estimation, flipping the phase of the all zero state and
+            # redoing the phase estimation is a reflection about the phase estimation state.
+            state -= 2 * qpe_state * np.vdot(qpe_state, state)
+
+        # The target sum index qubit is the most significant bit of the index state, so it is
+        # traced out by folding the rows.
+        return np.sum(np.abs(state) ** 2, axis=1).reshape(2, -1).sum(axis=0)
+
+    def simulate_numpy(self, shots=NUMPY_SIMULATION_SHOTS):
+        """
+        Simulates the subset sum circuit directly with NumPy and returns measurements.
+
+        Arguments:
+            shots: The number of measurements to sample from the final state.
+
+        Returns:
+            dict: A set of measurements and their frequencies.
+        """
+        # Measuring the index qubits of the input values.
+        probabilities = self.numpy_probabilities()
+        frequencies = np.random.default_rng().multinomial(
+            shots, probabilities / probabilities.sum()
+        )
+
+        counts = {
+            format(index_state, f"0{self.num_values}b"): int(frequency)
+            for index_state, frequency in enumerate(frequencies)
+            if frequency
+        }
+        self.counts = counts
+        return counts
+
     def ibmq_execute(self, qc):
         """
         Executes a quantum circuit on an actual IBM quantum computer and returns measurements.
@@ -226,14 +396,10 @@ class QuantumSubsetSum:
         Returns:
             dict: A set of measurements and their frequencies.
         """
-        IBMQ.load_account()
-        provider = IBMQ.get_provider(hub="ibm-q", group="open", project="main")
-        backend = provider.get_backend("ibmq_bogota")
+        backend = _get_ibmq_backend("ibmq_bogota")
 
         transpiled = transpile(qc, backend)
-        qobj = assemble(transpiled)
-        circuits, _, _ = disassemble(qobj)
-        job = execute(circuits, backend=backend, shots=10)
+        job = backend.run(transpiled, shots=10)
         job_monitor(job)
 
         result = job.result()
@@ -254,33 +420,35 @@ class QuantumSubsetSum:
         Returns:
             list((list, float)): A list of subsets representing solutions to the subset sum problem.
         """
-        total_measurements = sum(list(counts.values()))
-        counts = dict(sorted(counts.items(), key=lambda state: state[1], reverse=True))
-        counts = list(counts.items())
+        states = list(counts)
+        frequencies = np.fromiter(counts.values(), dtype=np.int64, count=len(states))
+        total_measurements = int(frequencies.sum())
+
+        # Unpacking the measured bits so that column i is set when the subset contains the
+        # value at index i.
+        index_states = np.fromiter(
+            (int(state, 2) for state in states), dtype=np.int64, count=len(states)
+        )
+        subset_bits = (index_states[:, None] >> np.arange(self.num_values)) & 1
+        is_solution = subset_bits @ np.asarray(self.values) == self.target_sum
+
+        # Solutions have the highest measurement probability and hence come first when sorting
+        # by frequency. Everything from the first measurement which is not a solution onwards
+        # is filtered out, as those subsets were only measured with low probability.
+        order = np.argsort(-frequencies, kind="stable")
+        non_solutions = np.flatnonzero(~is_solution[order])
+        num_solutions = non_solutions[0] if non_solutions.size else order.size
 
-        # Filtering out any of the subsets that were measured with low probability, but
-        # are not solutions.
         answer_subsets = []
-        for state, count in counts:
-            # Lopping off the target sum qubit and reversing to process from the least
-            # significant qubit first.
-            subset_qubits = list(reversed(state[1:]))
-
-            # If a qubit in the measurement state is set to 1, then the subset contains
-            # the value at the corresponding index.
-            subset = []
-            for index, value in enumerate(subset_qubits):
-                if value == "1":
-                    subset.append(self.values[index])
-
-            if sum(subset) == self.target_sum:
-                # Returning the subset as well as its measurement probability.
-                answer_subsets.append((subset, count / total_measurements))
-            else:
-                # We break out of the loop as soon as we hit a measurement which is not a solution.
-                # This works as solutions have the highest measurement probability and hence will
-                # come first in the sorted list.
-                break
+        for state in order[:num_solutions]:
+            subset = [
+                self.values[index] for index in np.flatnonzero(subset_bits[state])
+            ]
+
+            # Returning the subset as well as its measurement probability.
+            answer_subsets.append(
+                (subset, int(frequencies[state]) / total_measurements)
+            )
 
         return answer_subsets
 
@@ -288,27 +456,130 @@ class QuantumSubsetSum:
         """
         Executes a quantum circuit that can solve the subset sum problem and returns results.
         """
-        qc = self.build()
-
         counts = None
-        if simulate:
-            counts = self.simulate(qc)
+        if simulate and self.num_qubits <= NUMPY_SIMULATION_MAX_QUBITS:
+            counts = self.simulate_numpy()
+        elif simulate:
+            counts = self.simulate(self.build(use_diagonal=True))
         else:
-            counts = self.ibmq_execute(qc)
+            counts = self.ibmq_execute(self.build())
 
         answer_subsets = self.process_measurements(counts)
         return answer_subsets
 
+    @staticmethod
+    def execute_batch(instances):
+        """
+        Simulates the circuits of several instances of the subset sum problem together and
+        returns the results of each.
+
+        Instances small enough to be simulated with NumPy are simulated individually, while the
+        circuits of all other instances are translated and run on the simulator in one batch.
+
+        Arguments:
+            instances: The QuantumSubsetSum instances to execute.
+
+        Returns:
+            list(list((list, float))): The answer subsets of each instance, in the same order.
+        """
+        circuit_instances = []
+        for instance in instances:
+            if instance.num_qubits <= NUMPY_SIMULATION_MAX_QUBITS:
+                instance.simulate_numpy()
+            else:
+                circuit_instances.append(instance)
+
+        if circuit_instances:
+            aer_sim = _aer_simulator()
+            circuits = [
+                instance.build(use_diagonal=True) for instance in circuit_instances
+            ]
+            result = aer_sim.run(_translate_for_aer(circuits, aer_sim)).result()
+
+            for experiment, instance in enumerate(circuit_instances):
+                instance.counts = result.get_counts(experiment)
+
+        return [
+            instance.process_measurements(instance.counts) for instance in instances
+        ]
+
+
+def _aer_simulator():
+    """
+    Returns the Aer simulator used to simulate subset sum circuits.
+
+    Returns:
+        qiskit.providers.aer.AerSimulator: A statevector simulator.
+    """
+    # Measurements only happen at the end of the circuit, so every shot is sampled from a
+    # single statevector simulation and all threads are given to the statevector updates
+    # rather than to shots. The default double precision is kept, as the pinned Aer release
+    # crashes on these circuits in single precision.
+    return AerSimulator(
+        method="statevector",
+        max_parallel_threads=os.cpu_count(),
+        max_parallel_shots=1,
+    )
+
+
+def _translate_for_aer(circuits, aer_sim):
+    """
+    Translates circuits into the gates supported by an Aer simulator.
+
+    Arguments:
+        circuits: A circuit or list of circuits to translate.
+        aer_sim: The simulator the circuits will be run on.
+
+    Returns:
+        qiskit.QuantumCircuit or list(qiskit.QuantumCircuit): The translated circuits.
+    """
+    # The simulator supports a broad set of gates natively and has no connectivity
+    # constraints, so the only transpilation needed is translating the custom gates
+    # into that set. Layout, routing and optimization passes are skipped entirely.
+    basis_gates = aer_sim.configuration().basis_gates
+    translation = PassManager(
+        [
+            UnrollCustomDefinitions(SessionEquivalenceLibrary, basis_gates),
+            BasisTranslator(SessionEquivalenceLibrary, basis_gates),
+        ]
+    )
+    return translation.run(circuits)
+
+
+def _get_ibmq_backend(name):
+    """
+    Returns an IBMQ backend, loading the IBMQ account if it has not been loaded yet.
+
+    Arguments:
+        name: The name of the backend.
+
+    Returns:
+        qiskit.providers.ibmq.IBMQBackend: The backend with the given name.
+    """
+    if name not in _backend_cache:
+        if IBMQ.active_account() is None:
+            IBMQ.load_account()
+        provider = IBMQ.get_provider(hub="ibm-q", group="open", project="main")
+        _backend_cache[name] = provider.get_backend(name)
+
+    return _backend_cache[name]
+
 
-def normalize(values):
+def normalize(values, target_sum):
     """
-    Normalizes the provided set of values.
+    Normalizes the provided set of values together with the target sum.
 
     Arguments:
         values: The set of values to be normalized.
+        target_sum: The target sum to be normalized alongside the values.
 
     Returns:
-        numpy.ndarray: The set of values normalized between 0 and 1.
+        (numpy.ndarray, float): The set of values and the target sum normalized between 0 and 1.
     """
-    values = np.array(values)
-    return values / values.sum()
+    # Filling a single preallocated buffer and normalizing it in place, rather than
+    # concatenating the target sum onto the values and copying the result.
+    normalized = np.empty(len(values) + 1)
+    normalized[:-1] = values
+    normalized[-1] = target_sum
+    normalized /= normalized.sum()
+    return normalized[:-1], normalized[-1]
@@ -2,6 +2,10 @@
 
 import unittest
 
+import numpy as np
+
+from qiskit.quantum_info import Statevector
+
 from qss import QuantumSubsetSum
 
 
@@ -28,6 +32,19 @@ class TestQuantumSubsetSum(unittest.TestCase):
 
         self.check_answer_subsets(values, target_sum, expected_answer_subsets)
 
+    def test_single_solution_many_values(self):
+        """
+        Tests that a single subset is returned for a larger input set, for which the number
+        of Grover iterations is tuned towards multiple solutions.
+        """
+        values = [3, 5, 9, 17, 33]
+
+        target_sum = 20
+
+        expected_answer_subsets = [[3, 17]]
+
+        self.check_answer_subsets(values, target_sum, expected_answer_subsets)
+
     def test_multiple_solutions(self):
         """Tests that multiple subsets are returned if multiple add up to the target sum."""
         values = [5, 7, 8, 9, 1]
@@ -72,6 +89,79 @@ class TestQuantumSubsetSum(unittest.TestCase):
 
         self.check_answer_subsets(values, target_sum, expected_answer_subsets)
 
+    def test_execute_batch(self):
+        """
+        Tests that executing multiple instances in a batch returns the solutions of each instance.
+        """
+        problems = [
+            ([1, 3, 11], 8, []),
+            ([5, 2, 1], 3, [[2, 1]]),
+            ([5, 7, 8, 9, 1], 16, [[7, 8, 1], [7, 9]]),
+            ([2, 3, 5, 7, 11], 10, [[3, 7], [2, 3, 5]]),
+        ]
+
+        instances = [
+            QuantumSubsetSum(values, target_sum) for values, target_sum, _ in problems
+        ]
+        batch_answer_subsets = QuantumSubsetSum.execute_batch(instances)
+
+        self.assertEqual(len(batch_answer_subsets), len(problems))
+
+        for answer_subsets, (_, _, expected_answers) in zip(
+            batch_answer_subsets, problems
+        ):
+            self.assertEqual(len(answer_subsets), len(expected_answers))
+
+            for subset, _ in answer_subsets:
+                self.assertIn(subset, expected_answers)
+
+    def test_numpy_simulation_matches_circuit(self):
+        """
+        Tests that the NumPy simulation yields the same measurement probabilities as the circuit,
+        with the phase encoding built from controlled phases as well as from a diagonal gate.
+        """
+        values = [5, 2, 1]
+
+        target_sum = 3
+
+        expected_probabilities = QuantumSubsetSum(
+            values, target_sum
+        ).numpy_probabilities()
+
+        for use_diagonal in (False, True):
+            qss = QuantumSubsetSum(values, target_sum)
+            qc = qss.build(use_diagonal=use_diagonal)
+            state = Statevector(qc.remove_final_measurements(inplace=False))
+
+            # The index qubits of the input values directly follow the sum qubits.
+            num_sum_qubits = qss.num_sum_qubits
+            index_qubits = list(range(num_sum_qubits, num_sum_qubits + qss.num_values))
+            probabilities = state.probabilities(index_qubits)
+
+            np.testing.assert_allclose(probabilities, expected_probabilities, atol=1e-9)
+
+    def test_build_with_single_sum_qubit(self):
+        """
+        Tests that a circuit can be built when a single sum qubit suffices, in which case the
+        oracle has no sum qubits to use as controls.
+        """
+        qss = QuantumSubsetSum([1], 1)
+
+        self.assertEqual(qss.num_sum_qubits, 1)
+
+        qc = qss.build()
+
+        self.assertEqual(qc.num_qubits, qss.num_qubits)
+
+    def test_numpy_integer_values(self):
+        """
+        Tests that values given as NumPy integers are accepted when sizing the sum register.
+        """
+        qss = QuantumSubsetSum(list(np.array([3, 4])), 7)
+
+        self.assertEqual(qss.num_sum_qubits, QuantumSubsetSum([3, 4], 7).num_sum_qubits)
+        self.assertEqual(qss.num_sum_qubits, 4)
+
     def check_answer_subsets(self, values, target_sum, expected_answers):
         """A helper function for determining if a set of answer subsets is valid."""
         qss = QuantumSubsetSum(values, target_sum)